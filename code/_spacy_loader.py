@@ -0,0 +1,30 @@
+"""
+Shared spaCy model loader for the demo scripts.
+
+Every demo that needs a model goes through get_nlp(), so a model is
+loaded at most once per process no matter how many demos import it —
+spacy.load costs seconds and hundreds of MB per call.
+"""
+
+import functools
+
+import spacy
+
+# For demos that only read word vectors: excluding every pipeline
+# component loads just the tokenizer and the static vectors table. Note
+# the vectors table itself dominates the lg model's footprint (~600 MB)
+# and cannot be excluded — this trims load time and the component
+# weights, not the bulk of the memory.
+VECTORS_ONLY = ("tok2vec", "tagger", "parser", "ner", "lemmatizer", "attribute_ruler")
+
+@functools.lru_cache(maxsize=None)
+def get_nlp(model_name, exclude=()):
+    """Load a spaCy model once per (model_name, exclude) and reuse it.
+
+    The cache is deliberately unbounded: every distinct model stays
+    resident for the life of the process. That trades extra RSS (one
+    vectors table per cached model) for never paying spacy.load twice —
+    the right call for these short demo scripts, but worth bounding if
+    this loader ever serves something long-running.
+    """
+    return spacy.load(model_name, exclude=list(exclude))
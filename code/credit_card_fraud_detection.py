@@ -5,12 +5,35 @@
 # vector techniques (Word2Vec) to detect credit card fraud.
 #
 # Required Libraries:
-# pip install gensim scikit-learn numpy
+# pip install gensim scikit-learn numpy numba
 # ==============================================================================
 
+import os
+import tempfile
+
 import numpy as np
 from gensim.models import Word2Vec
-from sklearn.ensemble import RandomForestClassifier
+from gensim.models.word2vec import FAST_VERSION
+from numba import njit, prange
+from sklearn.ensemble import HistGradientBoostingClassifier
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# The Cython BLAS path is the difference between ~100k and millions of
+# words/sec; fail loudly if gensim fell back to the pure-numpy trainer.
+assert FAST_VERSION > -1, "gensim not using its Cython BLAS path — reinstall with a compiler/BLAS available"
+
+def _training_workers():
+    """Worker count for Word2Vec: physical cores, capped at 16.
+    Hyperthread oversubscription regresses training throughput."""
+    if psutil is not None:
+        physical = psutil.cpu_count(logical=False)
+    else:
+        physical = os.cpu_count()
+    return min(physical or 4, 16)
 
 def train_merchant_vectorizer(transaction_sequences, vector_size=50, window=3, min_count=1):
     """
@@ -26,16 +49,134 @@ def train_merchant_vectorizer(transaction_sequences, vector_size=50, window=3, m
         gensim.models.Word2Vec: The trained model.
     """
     print(">>> Step 1: Training a Word2Vec model on transaction sequences...")
-    model = Word2Vec(
-        sentences=transaction_sequences,
-        vector_size=vector_size,
-        window=window,
-        min_count=min_count,
-        workers=4
-    )
+
+    # Feed gensim a line-delimited corpus file instead of a Python list:
+    # the corpus_file path lets the Cython worker threads read tokens
+    # without being serialized behind a single GIL-holding iterator.
+    corpus_fd, corpus_path = tempfile.mkstemp(suffix='.txt', text=True)
+    try:
+        with os.fdopen(corpus_fd, 'w') as f:
+            f.writelines(' '.join(seq) + '\n' for seq in transaction_sequences)
+
+        model = Word2Vec(
+            corpus_file=corpus_path,
+            vector_size=vector_size,
+            window=window,
+            min_count=min_count,
+            workers=_training_workers()
+        )
+    finally:
+        os.unlink(corpus_path)
+
     print(">>> Word2Vec model training complete.")
     return model
 
+# Cache of the model's unit-normalized vector matrix and key index,
+# computed once so hot loops gather rows with np.take instead of going
+# through KeyedVectors.__getitem__ per call.
+_normed_cache = {}
+
+def _normed_vectors(model):
+    """Return (unit-normalized (V, D) float32 matrix, key_to_index dict)."""
+    entry = _normed_cache.get(id(model))
+    if entry is None:
+        matrix = model.wv.get_normed_vectors().astype(np.float32, copy=False)
+        entry = (matrix, model.wv.key_to_index)
+        _normed_cache[id(model)] = entry
+    return entry
+
+# Module-level cache of merchant -> vector lookups. Popular merchants
+# ('starbucks', 'amazon', ...) recur across many histories, so repeat
+# feature builds become a dict hit instead of a vector-table copy.
+_merchant_vec_cache = {}
+
+def _merchant_vec(merchant, model):
+    """Look up a merchant's vector, caching hits (zero vector if unknown)."""
+    key = (id(model), merchant)
+    vec = _merchant_vec_cache.get(key)
+    if vec is None:
+        if merchant in model.wv.key_to_index:
+            vec = model.wv[merchant].astype(np.float32, copy=False)
+        else:
+            vec = np.zeros(model.vector_size, dtype=np.float32) # Zero vector if unknown
+        _merchant_vec_cache[key] = vec
+    return vec
+
+@njit(cache=True, fastmath=True)
+def _build_feature(hist_mat, new_vec, amount, out):
+    """
+    JIT-compiled numeric core: mean of the history vectors, the new
+    transaction vector, and the normalized amount, written into `out`.
+    Normalizing the amount is important for model performance.
+    """
+    vector_size = new_vec.shape[0]
+    n_hist = hist_mat.shape[0]
+
+    if n_hist == 0:
+        out[:vector_size] = 0.0
+    else:
+        for j in range(vector_size):
+            total = 0.0
+            for i in range(n_hist):
+                total += hist_mat[i, j]
+            out[j] = total / n_hist
+
+    out[vector_size:2 * vector_size] = new_vec
+    out[2 * vector_size] = np.log1p(amount) / 10.0 # Simple log normalization
+
+@njit(parallel=True, cache=True, fastmath=True)
+def _build_feature_batch(hist_flat, hist_offsets, new_vecs, amounts, out):
+    """
+    Builds feature vectors for a whole batch of examples in parallel.
+    Each example's history rows live in hist_flat[hist_offsets[i]:hist_offsets[i+1]];
+    every prange iteration writes its own row of `out`, so threads never contend.
+    """
+    for i in prange(new_vecs.shape[0]):
+        start = hist_offsets[i]
+        end = hist_offsets[i + 1]
+        _build_feature(hist_flat[start:end], new_vecs[i], amounts[i], out[i])
+
+def create_feature_vectors_batch(histories, new_transactions, amounts, model):
+    """
+    Creates feature vectors for a batch of (history, transaction, amount) examples.
+
+    Args:
+        histories (list of list of str): Recent merchants, one list per example.
+        new_transactions (list of str): The new merchant for each example.
+        amounts (list of float): The transaction amount for each example.
+        model (gensim.models.Word2Vec): The trained merchant vectorizer.
+
+    Returns:
+        numpy.ndarray: An (N, 2*vector_size + 1) matrix of feature vectors.
+    """
+    vector_size = model.vector_size
+    n_examples = len(histories)
+
+    # Flatten all history vectors into one matrix with per-example offsets
+    # (a ragged layout Numba can slice without Python objects).
+    matrix, key_to_index = _normed_vectors(model)
+    hist_offsets = np.zeros(n_examples + 1, dtype=np.int64)
+    hist_rows = []
+    for i, history in enumerate(histories):
+        idx = np.fromiter(
+            (key_to_index[m] for m in history if m in key_to_index), dtype=np.int64
+        )
+        if idx.size:
+            hist_rows.append(matrix.take(idx, axis=0))
+        hist_offsets[i + 1] = hist_offsets[i] + idx.size
+
+    if hist_rows:
+        hist_flat = np.vstack(hist_rows)
+    else:
+        hist_flat = np.empty((0, vector_size), dtype=np.float32)
+
+    new_vecs = np.stack([_merchant_vec(m, model) for m in new_transactions])
+    amounts = np.asarray(amounts, dtype=np.float32)
+
+    out = np.empty((n_examples, 2 * vector_size + 1), dtype=np.float32)
+    _build_feature_batch(hist_flat, hist_offsets, new_vecs, amounts, out)
+    return out
+
 def create_feature_vector(history, new_transaction, amount, model):
     """
     Creates a single feature vector from a user's history and a new transaction.
@@ -51,39 +192,49 @@ def create_feature_vector(history, new_transaction, amount, model):
     """
     vector_size = model.vector_size
 
-    # Get the vector for the new transaction merchant
-    try:
-        new_transaction_vec = model.wv[new_transaction]
-    except KeyError:
-        new_transaction_vec = np.zeros(vector_size) # Use a zero vector if unknown
+    # Get the vector for the new transaction merchant (cached)
+    new_transaction_vec = _merchant_vec(new_transaction, model)
 
-    # Create the user's average historical behavior vector ("behavioral fingerprint")
-    history_vectors = [model.wv[merchant] for merchant in history if merchant in model.wv]
+    # Gather the user's history rows from the precomputed normed matrix;
+    # the averaging and concatenation happen inside the JIT-compiled kernel.
+    matrix, key_to_index = _normed_vectors(model)
+    idx = np.fromiter(
+        (key_to_index[m] for m in history if m in key_to_index), dtype=np.int64
+    )
 
-    if not history_vectors:
-        behavior_vec = np.zeros(vector_size)
+    if idx.size:
+        hist_mat = matrix.take(idx, axis=0)
     else:
-        behavior_vec = np.mean(history_vectors, axis=0)
-
-    # Combine features: behavior vector, new transaction vector, and normalized amount
-    # Normalizing the amount is important for model performance.
-    normalized_amount = np.log1p(amount) / 10.0 # Simple log normalization
+        hist_mat = np.empty((0, vector_size), dtype=np.float32)
 
-    return np.concatenate([behavior_vec, new_transaction_vec, [normalized_amount]])
+    features = np.empty(2 * vector_size + 1, dtype=np.float32)
+    _build_feature(hist_mat, new_transaction_vec, amount, features)
+    return features
 
 def train_fraud_classifier(X_train, y_train):
     """
-    Trains a RandomForestClassifier on the feature vectors.
+    Trains a HistGradientBoostingClassifier on the feature vectors.
+    Histogram binning (int8 bin indices) and native multithreading make it
+    far faster than a random forest to fit and predict on numeric features.
 
     Args:
         X_train (list of numpy.ndarray): The training feature vectors.
         y_train (list of int): The training labels (0 = Not Fraud, 1 = Fraud).
 
     Returns:
-        sklearn.ensemble.RandomForestClassifier: The trained fraud classifier.
+        sklearn.ensemble.HistGradientBoostingClassifier: The trained fraud classifier.
     """
     print("\n>>> Step 3: Training the Fraud Classifier...")
-    classifier = RandomForestClassifier(n_estimators=100, random_state=42)
+    # min_samples_leaf=1: the default of 20 forbids any split on a toy
+    # training set this small, which would reduce the model to predicting
+    # the class prior for every transaction
+    classifier = HistGradientBoostingClassifier(
+        max_iter=200,
+        learning_rate=0.1,
+        max_bins=255,
+        min_samples_leaf=1,
+        random_state=42,
+    )
     classifier.fit(X_train, y_train)
     print(">>> Fraud classifier training complete.")
     return classifier
@@ -111,24 +262,22 @@ if __name__ == "__main__":
     print("\n>>> Step 2: Creating feature vectors for the fraud classifier...")
 
     # Example 1: Normal transaction for a standard user (Not Fraud)
-    history1 = ['starbucks', 'petrol', 'grocery_store', 'amazon']
-    features1 = create_feature_vector(history1, 'walmart', 75.0, merchant_model)
-    label1 = 0
-
     # Example 2: Normal transaction for a luxury user (Not Fraud)
-    history2 = ['gucci', 'louis_vuitton', 'prada']
-    features2 = create_feature_vector(history2, 'luxury_restaurant', 450.0, merchant_model)
-    label2 = 0
-
-    # Example 3: FRAUDULENT transaction for a standard user (Fraud)
-    # The purchase is completely out of character and has a high amount.
-    history3 = ['starbucks', 'petrol', 'grocery_store', 'amazon']
-    features3 = create_feature_vector(history3, 'gucci', 2500.0, merchant_model)
-    label3 = 1
-
-    # Assemble the training dataset
-    X_train_data = [features1, features2, features3]
-    y_train_data = [label1, label2, label3]
+    # Example 3: FRAUDULENT transaction for a standard user (Fraud) —
+    # the purchase is completely out of character and has a high amount.
+    train_histories = [
+        ['starbucks', 'petrol', 'grocery_store', 'amazon'],
+        ['gucci', 'louis_vuitton', 'prada'],
+        ['starbucks', 'petrol', 'grocery_store', 'amazon'],
+    ]
+    train_transactions = ['walmart', 'luxury_restaurant', 'gucci']
+    train_amounts = [75.0, 450.0, 2500.0]
+
+    # Assemble the training dataset with the parallel batch builder
+    X_train_data = create_feature_vectors_batch(
+        train_histories, train_transactions, train_amounts, merchant_model
+    )
+    y_train_data = [0, 0, 1]
 
     # 3. Train the fraud classifier
     fraud_model = train_fraud_classifier(X_train_data, y_train_data)
@@ -1,8 +1,25 @@
 # Make sure you have installed -> pip install gensim scikit-learn numpy
 
+import os
+
 import numpy as np
 from gensim.models import Word2Vec
-from sklearn.ensemble import RandomForestClassifier
+from gensim.models.word2vec import FAST_VERSION
+from sklearn.ensemble import HistGradientBoostingClassifier
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Make sure gensim is running its Cython BLAS trainer, not the numpy fallback.
+assert FAST_VERSION > -1, "gensim not using its Cython BLAS path — reinstall with a compiler/BLAS available"
+
+# Physical cores only — hyperthread oversubscription regresses training.
+if psutil is not None:
+    WORKERS = min(psutil.cpu_count(logical=False) or 4, 16)
+else:
+    WORKERS = min(os.cpu_count() or 4, 16)
 
 # --- Part 1: Simulate Financial Text Data & Train Vectorizer ---
 
@@ -24,28 +41,39 @@ financial_texts = [
 
 print(">>> Training a Word2Vec model on financial texts...")
 # This model learns the contextual meaning of financial terms.
-financial_model = Word2Vec(sentences=financial_texts, vector_size=50, window=2, min_count=1)
+financial_model = Word2Vec(sentences=financial_texts, vector_size=50, window=2, min_count=1, workers=WORKERS)
 print(">>> Model training complete.")
 
 # --- Part 2: Function to Create a "Financial Fingerprint" ---
 
+# Cache the unit-normalized vector matrix per model so fingerprints are a
+# contiguous np.take gather + mean instead of per-key KeyedVectors lookups.
+_normed_cache = {}
+
+def _normed_vectors(model):
+    entry = _normed_cache.get(id(model))
+    if entry is None:
+        entry = (model.wv.get_normed_vectors(), model.wv.key_to_index)
+        _normed_cache[id(model)] = entry
+    return entry
+
 def get_financial_fingerprint(transaction_history, model):
     """
     Averages the vectors of a user's recent transactions to create a single behavior vector.
     """
-    vectors = []
-    for item in transaction_history:
-        try:
-            vectors.append(model.wv[item])
-        except KeyError:
-            # Ignore terms not in our model's vocabulary
-            continue
-
-    if not vectors:
+    # Ignore terms not in our model's vocabulary, then gather the known rows
+    # from the precomputed normed matrix in one contiguous take.
+    matrix, key_to_index = _normed_vectors(model)
+    idx = np.fromiter(
+        (key_to_index[item] for item in transaction_history if item in key_to_index),
+        dtype=np.int64
+    )
+
+    if not idx.size:
         return np.zeros(model.vector_size) # Return a zero vector if no history
 
     # Average the vectors to get the "financial fingerprint"
-    return np.mean(vectors, axis=0)
+    return matrix.take(idx, axis=0).mean(axis=0)
 
 # --- Part 3: Train a Simple Credit Risk Classifier ---
 
@@ -70,8 +98,14 @@ risk_label3 = 1 # High Risk
 X_train = [fingerprint1, fingerprint2, fingerprint3]
 y_train = [risk_label1, risk_label2, risk_label3]
 
-# Create and train the classifier
-risk_classifier = RandomForestClassifier(n_estimators=10, random_state=42)
+# Create and train the classifier — histogram gradient boosting bins the
+# features into int8 indices, which fits and predicts much faster than a
+# random forest on numeric inputs like these averaged vectors. The default
+# min_samples_leaf of 20 would block every split on three applicants, so
+# relax it to 1 for this toy dataset.
+risk_classifier = HistGradientBoostingClassifier(
+    max_iter=100, learning_rate=0.1, min_samples_leaf=1, random_state=42
+)
 risk_classifier.fit(X_train, y_train)
 
 print(">>> Risk model trained.")
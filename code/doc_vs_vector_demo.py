@@ -1,6 +1,7 @@
-import spacy
+from _spacy_loader import VECTORS_ONLY, get_nlp
 
-nlp_lg = spacy.load('en_core_web_lg')
+# Shared cached loader; only the static vectors are needed here
+nlp_lg = get_nlp('en_core_web_lg', exclude=VECTORS_ONLY)
 
 # Full sentence
 doc = nlp_lg("I love pizza")
@@ -15,20 +15,103 @@ Think of it like having a smart assistant that:
 This demo uses simple Python libraries that students can understand!
 """
 
+import heapq
 import json
-from datetime import datetime
-from typing import List, Dict   
+import math
+import os
+import pickle
+import re
+import time
+from typing import List, Dict
+
+from collections import Counter
+
+# Optional: real semantic retrieval with spaCy vectors (use_embeddings=True).
+# The keyword path works without either package installed. numpy and spaCy
+# are imported separately so a missing spaCy doesn't disable the
+# numpy-backed fast paths (numba kernel, index persistence).
+try:
+    import numpy as np
+except ImportError:
+    np = None
+try:
+    import spacy
+except ImportError:
+    spacy = None
+
+# Optional: a compiled scoring kernel for big knowledge bases.
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Below this many documents the plain-Python loop wins (no JIT warmup).
+NUMBA_MIN_DOCS = 256
+
+# One compiled tokenizer pattern shared by ingestion and queries
+_TOK = re.compile(r"\w+")
+
+def _tokenize_query(text: str) -> set:
+    """Single-pass query tokenization: lowercase per match, so the whole
+    string is never copied just to be lowercased."""
+    return {m.group(0).lower() for m in _TOK.finditer(text)}
+
+if njit is not None and np is not None:
+    @njit(cache=True)
+    def _score_postings(query_token_ids, starts, postings, n_docs):
+        """Tally per-document match counts from the flattened posting lists"""
+        scores = np.zeros(n_docs, dtype=np.int32)
+        for i in range(query_token_ids.shape[0]):
+            token_id = query_token_ids[i]
+            for j in range(starts[token_id], starts[token_id + 1]):
+                scores[postings[j]] += 1
+        return scores
+else:
+    _score_postings = None
 
 class StudentRAG:
     """A SIMPLE RAG system that students can understand"""
     
-    def __init__(self):
+    def __init__(self, use_embeddings=False, verbose=True):
+        # All per-query narration goes through self._log; pass
+        # verbose=False for batch evaluation, where stdout IO would
+        # otherwise dominate the (now fast) search itself
+        self.verbose = verbose
+        self._log = print if verbose else (lambda *args, **kwargs: None)
+
         print("🚀 Starting Simple RAG System...")
         print("=" * 50)
-        
+
+        # Optional dense retrieval: documents are embedded with spaCy
+        # vectors and searched with one matrix @ query_vec product
+        self.use_embeddings = use_embeddings
+        self.nlp = None
+        self.doc_vecs = None    # (N, D) int8, rows L2-normalized then quantized (lazy)
+        self.doc_scales = None  # (N,) float32 per-row dequantization scales
+        if use_embeddings:
+            if spacy is None:
+                raise ImportError("use_embeddings=True needs: pip install spacy numpy")
+            print("📦 Loading spaCy vectors for semantic search...")
+            self.nlp = spacy.load(
+                "en_core_web_lg",
+                disable=["tagger", "parser", "ner", "lemmatizer", "attribute_ruler"]
+            )
+
         # Our "database" - just a list of documents
         self.knowledge_base = []
         self.document_count = 0
+
+        # Inverted index: word -> set of document ids containing it.
+        # Searching becomes a handful of dictionary lookups instead of
+        # re-reading every document for every query.
+        self.inverted_index = {}
+
+        # word -> IDF weight, rebuilt lazily after documents change.
+        # Rare words count for more than common ones when ranking.
+        self._idf = None
+
+        # Flattened posting arrays for the compiled scoring kernel (lazy)
+        self._flat_postings = None
         
         print("✅ RAG System Ready!")
         print("📚 Knowledge Base: Empty (ready to add documents)")
@@ -36,78 +119,330 @@ class StudentRAG:
     
     def add_document(self, title: str, content: str, category: str = "general"):
         """Add a document to our knowledge base"""
+        document = self._ingest(title, content, category,
+                                time.strftime("%Y-%m-%d %H:%M:%S"))
+
+        self._log(f"📄 Added: '{title}' ({document['word_count']} words)")
+        return document["id"]
+
+    def add_documents(self, docs: List[Dict]):
+        """
+        Add a whole batch of documents at once.
+        The timestamp is captured once and the per-document announcements
+        are written with a single print, so bulk loads don't pay per-insert
+        overhead.
+        """
+        added_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        lines = []
+        doc_ids = []
+
+        for doc in docs:
+            document = self._ingest(
+                doc["title"], doc["content"], doc.get("category", "general"), added_at
+            )
+            doc_ids.append(document["id"])
+            lines.append(f"📄 Added: '{document['title']}' ({document['word_count']} words)")
+
+        self._log("\n".join(lines))
+        return doc_ids
+
+    def _ingest(self, title: str, content: str, category: str, added_at: str) -> Dict:
+        """Shared insert path: build the document record and update the index"""
         doc_id = self.document_count
-        
+
+        sentences = content.split('. ')
+        lower_text = (title + " " + content).lower()
+
+        # Proper word tokens (no punctuation stuck to words), so "cat"
+        # matches the word "cat" but not the inside of "category"
+        tokens = frozenset(_TOK.findall(lower_text))
+
         document = {
             "id": doc_id,
             "title": title,
             "content": content,
             "category": category,
-            "added_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "word_count": len(content.split())
+            "added_at": added_at,
+            "word_count": content.count(' ') + 1,
+            # Precomputed once here so queries never re-lowercase or
+            # re-split the document text
+            "_tokens": tokens,
+            "_sentences": sentences,
+            "_sentence_tokens": [
+                frozenset(_TOK.findall(s.lower())) for s in sentences
+            ]
         }
         
         self.knowledge_base.append(document)
         self.document_count += 1
-        
-        print(f"📄 Added: '{title}' ({len(content.split())} words)")
-        return doc_id
+
+        # Update the inverted index with this document's word tokens
+        for word in tokens:
+            self.inverted_index.setdefault(word, set()).add(doc_id)
+        self._idf = None  # Document frequencies changed
+        self._flat_postings = None
+        self.doc_vecs = None  # Embedding matrix must be rebuilt too
+
+        return document
+
+    def save_index(self, path_prefix: str = "student_rag"):
+        """
+        Persist the knowledge base, inverted index, and (if built) the
+        quantized embeddings, so the next run skips rebuilding everything.
+        """
+        with open(path_prefix + "_kb.pkl", "wb") as f:
+            pickle.dump({
+                "knowledge_base": self.knowledge_base,
+                "inverted_index": self.inverted_index
+            }, f)
+
+        if self.doc_vecs is not None:
+            np.save(path_prefix + "_vecs.npy", self.doc_vecs)
+            np.save(path_prefix + "_scales.npy", self.doc_scales)
+
+        print(f"💾 Index saved to {path_prefix}_*.pkl/.npy")
+
+    def load_index(self, path_prefix: str = "student_rag") -> bool:
+        """
+        Restore a previously saved index. Embeddings come back as a
+        memory-mapped array, so pages load on demand (and can be shared
+        across processes via the page cache). Returns True on success.
+        """
+        kb_path = path_prefix + "_kb.pkl"
+        if not os.path.exists(kb_path):
+            return False
+
+        with open(kb_path, "rb") as f:
+            saved = pickle.load(f)
+        self.knowledge_base = saved["knowledge_base"]
+        self.inverted_index = saved["inverted_index"]
+        self.document_count = len(self.knowledge_base)
+        self._idf = None
+        self._flat_postings = None
+
+        # Leftover embeddings from an earlier run are only useful (and
+        # only loadable) when numpy is around; the keyword index above
+        # is restored either way
+        vecs_path = path_prefix + "_vecs.npy"
+        if np is not None and os.path.exists(vecs_path):
+            self.doc_vecs = np.load(vecs_path, mmap_mode="r")
+            self.doc_scales = np.load(path_prefix + "_scales.npy")
+
+        print(f"📂 Loaded {self.document_count} documents from {kb_path}")
+        return True
+
+    def _get_doc_vecs(self):
+        """Return the (int8 embedding matrix, per-row scales) pair"""
+        if self.doc_vecs is None:
+            texts = [doc["title"] + ". " + doc["content"] for doc in self.knowledge_base]
+            vecs = np.stack(
+                [doc.vector for doc in self.nlp.pipe(texts, batch_size=32)]
+            ).astype(np.float32)
+            vecs /= np.linalg.norm(vecs, axis=1, keepdims=True) + 1e-9
+
+            # Quantize each row to int8 with its own scale: 4x less memory
+            # traffic during the scan, and cosine ranking barely notices
+            # the lost precision
+            scales = np.abs(vecs).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self.doc_vecs = np.round(vecs / scales[:, None]).astype(np.int8)
+            self.doc_scales = scales.astype(np.float32)
+        return self.doc_vecs, self.doc_scales
+
+    def _mmr_select(self, candidates, scores, max_results, lambda_=0.7):
+        """
+        Maximal Marginal Relevance: greedily pick documents that are
+        relevant to the query but dissimilar to what's already picked.
+        Costs one small K x K cosine matrix over the candidate pool.
+        """
+        # Dequantize just the candidate rows back to float32
+        cand_vecs = (
+            self.doc_vecs[candidates].astype(np.float32)
+            * self.doc_scales[candidates, None]
+        )
+        sim_dd = cand_vecs @ cand_vecs.T  # K x K pairwise similarities
+        sim_qd = scores[candidates]
+
+        selected = [0]  # Best-scoring candidate always goes first
+        remaining = list(range(1, len(candidates)))
+
+        while remaining and len(selected) < max_results:
+            best_pos = None
+            best_value = -np.inf
+            for pos in remaining:
+                redundancy = max(sim_dd[pos, s] for s in selected)
+                value = lambda_ * sim_qd[pos] - (1 - lambda_) * redundancy
+                if value > best_value:
+                    best_value = value
+                    best_pos = pos
+            selected.append(best_pos)
+            remaining.remove(best_pos)
+
+        return candidates[selected]
+
+    def semantic_search(self, query: str, max_results: int = 3) -> List[Dict]:
+        """
+        Dense retrieval: cosine similarity between the query vector and
+        every document vector, computed as a single matrix product.
+        """
+        self._log(f"🔍 Semantic search for: '{query}'")
+        self._log("-" * 30)
+
+        # Nothing indexed yet — return empty like the keyword path does
+        # instead of letting np.stack choke on a zero-document matrix
+        if not self.knowledge_base:
+            return []
+
+        doc_vecs, doc_scales = self._get_doc_vecs()
+
+        query_vec = self.nlp(query).vector.astype(np.float32)
+        query_vec /= np.linalg.norm(query_vec) + 1e-9
+
+        # Asymmetric distance: int8 document rows, full-precision query;
+        # per-row scales restore the cosine magnitudes after the product
+        scores = (doc_vecs.astype(np.float32) @ query_vec) * doc_scales
+
+        # Pull a wider candidate pool, then rerank it for diversity so
+        # three near-duplicate documents don't crowd out a distinct one
+        fetch_k = min(max(10, max_results), scores.size)
+        top = np.argpartition(-scores, fetch_k - 1)[:fetch_k]
+        top = top[np.argsort(-scores[top])]
+
+        if len(top) > max_results:
+            top = self._mmr_select(top, scores, max_results)
+
+        results = []
+        for doc_id in top:
+            doc = self.knowledge_base[doc_id]
+            results.append({
+                "document": doc,
+                "relevance_score": float(scores[doc_id]),
+                "matched_words": [],
+                "match_count": 0
+            })
+            self._log(f"  {len(results)}. '{doc['title']}' (Score: {scores[doc_id]:.2f})")
+            self._log(f"     Category: {doc['category']}")
+            self._log(f"     Preview: {doc['content'][:100]}...")
+            self._log()
+
+        return results
+
+    def _get_flat_postings(self):
+        """Flatten the inverted index into (token->id, starts, postings) arrays
+        the compiled kernel can walk without touching Python objects."""
+        if self._flat_postings is None:
+            token_to_id = {}
+            starts = np.zeros(len(self.inverted_index) + 1, dtype=np.int32)
+            flat = []
+            for token_id, (token, doc_ids) in enumerate(self.inverted_index.items()):
+                token_to_id[token] = token_id
+                flat.extend(doc_ids)
+                starts[token_id + 1] = len(flat)
+            postings = np.asarray(flat, dtype=np.int32)
+            self._flat_postings = (token_to_id, starts, postings)
+        return self._flat_postings
+
+    def _get_idf(self) -> Dict[str, float]:
+        """Return the word -> IDF table, rebuilding it if documents changed"""
+        if self._idf is None:
+            n_docs = len(self.knowledge_base)
+            self._idf = {
+                word: math.log(n_docs / (1 + len(doc_ids))) + 1.0
+                for word, doc_ids in self.inverted_index.items()
+            }
+        return self._idf
     
-    def simple_search(self, query: str, max_results: int = 3) -> List[Dict]:
+    def simple_search(self, query: str, max_results: int = 3,
+                      query_words: set = None) -> List[Dict]:
         """
         SIMPLE search - just look for matching words!
         Real RAG systems use embeddings, but this helps students understand the concept.
         """
-        print(f"🔍 Searching for: '{query}'")
-        print("-" * 30)
-        
-        # Convert query to lowercase words
-        query_words = query.lower().split()
+        self._log(f"🔍 Searching for: '{query}'")
+        self._log("-" * 30)
+
+        # Tokenize the query the same way documents are tokenized
+        # (unless the caller already did)
+        if query_words is None:
+            query_words = _tokenize_query(query)
+
+        # A word that appears in no document can't score anything, so
+        # drop it up front — and if nothing is left, skip the scan entirely
+        known_words = {w for w in query_words if w in self.inverted_index}
+        if not known_words:
+            self._log("📊 Found 0 relevant documents:")
+            return []
+
+        # Walk only the posting lists for the query words — documents
+        # without any match are never touched. Each match is weighted by
+        # the word's IDF, so rare words count for more than stopwords.
+        idf = self._get_idf()
+        match_counts = Counter()
+        scores = Counter()
+        matched_words = {}  # doc_id -> list of query words found in it
+
+        if _score_postings is not None and len(self.knowledge_base) >= NUMBA_MIN_DOCS:
+            # Big knowledge base: tally counts in the compiled kernel, then
+            # resolve words/weights only for the (few) matching documents
+            token_to_id, starts, postings = self._get_flat_postings()
+            query_ids = np.asarray(
+                [token_to_id[w] for w in known_words], dtype=np.int32
+            )
+            counts = _score_postings(
+                query_ids, starts, postings, len(self.knowledge_base)
+            )
+            for doc_id in np.nonzero(counts)[0]:
+                doc_id = int(doc_id)
+                matched = [
+                    w for w in known_words
+                    if w in self.knowledge_base[doc_id]["_tokens"]
+                ]
+                match_counts[doc_id] = len(matched)
+                scores[doc_id] = sum(idf[w] for w in matched)
+                matched_words[doc_id] = matched
+        else:
+            for word in known_words:
+                weight = idf[word]
+                for doc_id in self.inverted_index[word]:
+                    match_counts[doc_id] += 1
+                    scores[doc_id] += weight
+                    matched_words.setdefault(doc_id, []).append(word)
+
+        # Normalize by the total weight a perfect match would get
+        total_weight = sum(idf.get(word, 0.0) for word in query_words)
+
         results = []
+        for doc_id, matches in match_counts.items():
+            relevance = scores[doc_id] / total_weight if total_weight else 0
+
+            results.append({
+                "document": self.knowledge_base[doc_id],
+                "relevance_score": relevance,
+                "matched_words": matched_words[doc_id],
+                "match_count": matches
+            })
         
-        # Check each document
-        for doc in self.knowledge_base:
-            # Count how many query words appear in the document
-            doc_text = (doc["title"] + " " + doc["content"]).lower()
-            
-            matches = 0
-            matched_words = []
-            
-            for word in query_words:
-                if word in doc_text:
-                    matches += 1
-                    matched_words.append(word)
-            
-            # Calculate simple relevance score
-            relevance = matches / len(query_words) if query_words else 0
-            
-            if matches > 0:  # Only include documents with at least one match
-                results.append({
-                    "document": doc,
-                    "relevance_score": relevance,
-                    "matched_words": matched_words,
-                    "match_count": matches
-                })
-        
-        # Sort by relevance (highest first)
-        results.sort(key=lambda x: x["relevance_score"], reverse=True)
-        
+        # Keep only the top results: O(N log k) instead of sorting everything
+        top_results = heapq.nlargest(
+            max_results, results, key=lambda x: x["relevance_score"]
+        )
+
         # Show search results
-        print(f"📊 Found {len(results)} relevant documents:")
-        for i, result in enumerate(results[:max_results], 1):
+        self._log(f"📊 Found {len(results)} relevant documents:")
+        for i, result in enumerate(top_results, 1):
             doc = result["document"]
             score = result["relevance_score"]
             matches = result["matched_words"]
             
-            print(f"  {i}. '{doc['title']}' (Score: {score:.2f})")
-            print(f"     Category: {doc['category']}")
-            print(f"     Matched words: {', '.join(matches)}")
-            print(f"     Preview: {doc['content'][:100]}...")
-            print()
+            self._log(f"  {i}. '{doc['title']}' (Score: {score:.2f})")
+            self._log(f"     Category: {doc['category']}")
+            self._log(f"     Matched words: {', '.join(matches)}")
+            self._log(f"     Preview: {doc['content'][:100]}...")
+            self._log()
         
-        return results[:max_results]
+        return top_results
     
-    def generate_answer(self, query: str, search_results: List[Dict]) -> str:
+    def generate_answer(self, query_words_lower: set, search_results: List[Dict]) -> str:
         """
         Generate an answer based on retrieved documents.
         This is simplified - real systems use AI models like GPT!
@@ -115,8 +450,8 @@ class StudentRAG:
         if not search_results:
             return "❌ Sorry, I couldn't find any relevant information in my knowledge base."
         
-        print("🧠 Generating answer from retrieved documents...")
-        print("-" * 40)
+        self._log("🧠 Generating answer from retrieved documents...")
+        self._log("-" * 40)
         
         # Combine information from top documents
         answer_parts = []
@@ -124,24 +459,16 @@ class StudentRAG:
         
         for result in search_results:
             doc = result["document"]
-            content = doc["content"]
-            
-            # Extract relevant sentences (simple approach)
-            sentences = content.split('. ')
-            relevant_sentences = []
-            
-            query_words = query.lower().split()
-            
-            for sentence in sentences:
-                sentence_lower = sentence.lower()
-                # If sentence contains query words, it's probably relevant
-                if any(word in sentence_lower for word in query_words):
-                    relevant_sentences.append(sentence.strip())
-            
-            if relevant_sentences:
-                # Take the first relevant sentence from each document
-                answer_parts.append(relevant_sentences[0])
-                sources_used.append(doc["title"])
+
+            # Only the first relevant sentence per document is used, so
+            # stop scanning as soon as one is found. Relevance is one set
+            # intersection against the token sets precomputed at
+            # add_document time — no substring scans.
+            for sentence, sentence_tokens in zip(doc["_sentences"], doc["_sentence_tokens"]):
+                if sentence_tokens & query_words_lower:
+                    answer_parts.append(sentence.strip())
+                    sources_used.append(doc["title"])
+                    break
         
         # Combine into a coherent answer
         if answer_parts:
@@ -161,14 +488,22 @@ class StudentRAG:
         Complete RAG pipeline: Search + Generate Answer
         This is the main function that students will use!
         """
-        print("🎯 RAG PIPELINE STARTING")
-        print("=" * 50)
-        print(f"❓ Question: {question}")
-        print()
+        self._log("🎯 RAG PIPELINE STARTING")
+        self._log("=" * 50)
+        self._log(f"❓ Question: {question}")
+        self._log()
         
+        # Tokenize the question once; search and answer generation reuse it
+        query_words_lower = _tokenize_query(question)
+
         # Step 1: RETRIEVAL - Find relevant documents
-        print("STEP 1: 🔍 RETRIEVAL")
-        search_results = self.simple_search(question, max_results=3)
+        self._log("STEP 1: 🔍 RETRIEVAL")
+        if self.use_embeddings:
+            search_results = self.semantic_search(question, max_results=3)
+        else:
+            search_results = self.simple_search(
+                question, max_results=3, query_words=query_words_lower
+            )
         
         if not search_results:
             return {
@@ -178,25 +513,25 @@ class StudentRAG:
                 "success": False
             }
         
-        print()
+        self._log()
         
         # Step 2: AUGMENTATION - Prepare context
-        print("STEP 2: 📝 AUGMENTATION")
-        print("Preparing context from retrieved documents...")
+        self._log("STEP 2: 📝 AUGMENTATION")
+        self._log("Preparing context from retrieved documents...")
         context_docs = [result["document"] for result in search_results]
-        print(f"✅ Using {len(context_docs)} documents as context")
-        print()
+        self._log(f"✅ Using {len(context_docs)} documents as context")
+        self._log()
         
         # Step 3: GENERATION - Create answer
-        print("STEP 3: 🤖 GENERATION")
-        answer = self.generate_answer(question, search_results)
+        self._log("STEP 3: 🤖 GENERATION")
+        answer = self.generate_answer(query_words_lower, search_results)
         
-        print("✅ Answer generated!")
-        print()
-        print("🎉 FINAL RESULT:")
-        print("-" * 20)
-        print(answer)
-        print()
+        self._log("✅ Answer generated!")
+        self._log()
+        self._log("🎉 FINAL RESULT:")
+        self._log("-" * 20)
+        self._log(answer)
+        self._log()
         
         return {
             "question": question,
@@ -276,9 +611,8 @@ def create_student_knowledge_base():
         }
     ]
     
-    # Add all documents to the knowledge base
-    for doc in documents:
-        rag.add_document(doc["title"], doc["content"], doc["category"])
+    # Add all documents to the knowledge base in one batch
+    rag.add_documents(documents)
     
     print(f"\n✅ Knowledge base created with {len(documents)} documents!")
     print("🎓 Ready for student questions!")
@@ -1,8 +1,10 @@
-import spacy
+from _spacy_loader import VECTORS_ONLY, get_nlp
 
-# Load the large English model (with word vectors)
+# Load the large English model (with word vectors) through the shared
+# cached loader. Only .vector / .similarity are used, so everything but
+# the tokenizer and the vectors table is excluded.
 print("Loading spaCy model...")
-nlp = spacy.load("en_core_web_lg")
+nlp = get_nlp("en_core_web_lg", exclude=VECTORS_ONLY)
 
 print("=== SIMPLE EMBEDDING DEMO ===\n")
 
@@ -11,10 +13,8 @@ sentence1 = "I love pizza"
 sentence2 = "Pizza is delicious"
 sentence3 = "The weather is sunny"
 
-# Process the sentences
-doc1 = nlp(sentence1)
-doc2 = nlp(sentence2)
-doc3 = nlp(sentence3)
+# Process all sentences in one batched pipe call
+doc1, doc2, doc3 = nlp.pipe([sentence1, sentence2, sentence3])
 
 print("Comparing these sentences:")
 print(f"1. '{sentence1}'")